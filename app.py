@@ -1,9 +1,15 @@
-import logging
 from flask import Flask
-from werkzeug.utils import find_modules, import_string
 
-from core.cache import cache
+from blueprints import admin
+from core.admission import admission
+from core.cache import cache, snapshot
+from core.profiler import profiler
 from core.database import mongo
+from core.registry import init_adapters
+from core.sharding import shards
+from core.dedupe import dedupe
+from core.events import events
+from core.fills import fills
 
 
 def create_app(config_filename='config/dev.py'):
@@ -11,16 +17,16 @@ def create_app(config_filename='config/dev.py'):
     app.config.from_pyfile(config_filename)
 
     cache.init_app(app)
+    snapshot.init_app(app)
     mongo.init_app(app)
-
-    for module_name in find_modules('blueprints', recursive=True):
-        try:
-            blueprint = import_string('{}.blueprint'.format(module_name))
-            app.register_blueprint(blueprint)
-        except ImportError:
-            pass
-        else:
-            logging.debug('registered {}'.format(module_name))
+    shards.init_app(app)
+    dedupe.init_app(app)
+    events.init_app(app)
+    fills.init_app(app)
+    admission.init_app(app)
+    profiler.init_app(app)
+    init_adapters(app)
+    app.register_blueprint(admin.blueprint)
 
     return app
 
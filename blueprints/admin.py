@@ -0,0 +1,52 @@
+import hmac
+from flask import Blueprint, Response, abort, current_app, jsonify, request
+
+from core.profiler import profiler
+
+blueprint = Blueprint('admin', __name__, url_prefix='/admin')
+
+
+@blueprint.before_request
+def check_token():
+    token = current_app.config.get('ADMIN_TOKEN')
+    # Compare bytes, compare_digest rejects non-ASCII str
+    if not token or not hmac.compare_digest(request.headers.get('admintoken', '').encode(), token.encode()):
+        abort(403)
+
+
+@blueprint.route('/profiler', methods=['GET'])
+def get_profiler():
+    return jsonify(
+        running=profiler.sampler.running,
+        samples=profiler.sampler.samples,
+        stacks=len(profiler.sampler.stacks)
+    )
+
+
+@blueprint.route('/profiler/start', methods=['POST'])
+def start_profiler():
+    duration = request.args.get('duration', 30, type=float)
+    interval = request.args.get('interval', None, type=float)
+    return jsonify(started=profiler.sampler.start(duration, interval))
+
+
+@blueprint.route('/profiler/stop', methods=['POST'])
+def stop_profiler():
+    profiler.sampler.stop()
+    return jsonify(running=False)
+
+
+@blueprint.route('/profiler/stacks', methods=['GET'])
+def get_stacks():
+    return Response(profiler.sampler.folded(), content_type='text/plain')
+
+
+@blueprint.route('/slowrequests', methods=['GET'])
+def get_slow_requests():
+    return jsonify(result=profiler.slow_requests.get_entries())
+
+
+@blueprint.route('/slowrequests', methods=['DELETE'])
+def clear_slow_requests():
+    profiler.slow_requests.clear()
+    return jsonify(result=[])
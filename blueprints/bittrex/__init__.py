@@ -0,0 +1,42 @@
+from core.registry import ExchangeAdapter
+
+adapter = ExchangeAdapter('bittrex')
+
+adapter.add_routes('/bittrex.com/api/v1.1/public', 'blueprints.bittrex.v1_1.public', [
+    ('/getmarkets', 'getmarkets'),
+    ('/getcurrencies', 'getcurrencies'),
+    ('/getticker', 'getticker'),
+    ('/getmarketsummaries', 'getmarketsummaries'),
+    ('/getorderbook', 'getorderbook'),
+    ('/getmarketsummary', 'getmarketsummary'),
+    ('/getmarkethistory', 'getmarkethistory'),
+])
+
+adapter.add_routes('/bittrex.com/api/v1.1/market', 'blueprints.bittrex.v1_1.market', [
+    ('/buylimit', 'buylimit'),
+    ('/selllimit', 'selllimit'),
+    ('/cancel', 'cancel'),
+    ('/getopenorders', 'getopenorders'),
+])
+
+# Bulk requests carry their orders in a JSON body, which is signed along with the url
+adapter.add_routes('/bittrex.com/api/v1.1/market', 'blueprints.bittrex.v1_1.market', [
+    ('/placeorders', 'placeorders'),
+    ('/cancelorders', 'cancelorders'),
+], methods=('POST',))
+
+adapter.add_routes('/bittrex.com/api/v1.1/account', 'blueprints.bittrex.v1_1.account', [
+    ('/getbalances', 'getbalances'),
+    ('/getbalance', 'getbalance'),
+    ('/getdepositaddress', 'getdepositaddress'),
+    ('/withdraw', 'withdraw'),
+    ('/getorder', 'getorder'),
+    ('/getorderhistory', 'getorderhistory'),
+    ('/getwitdrawalhistory', 'getwitdrawalhistory'),
+    ('/getdeposithistory', 'getdeposithistory'),
+    ('/getfills', 'getfills'),
+])
+
+adapter.add_routes('/bittrex.com/Api/v2.0/pub/market', 'blueprints.bittrex.v2_0.public', [
+    ('/GetTicks', 'get_ticks'),
+])
@@ -1,30 +1,39 @@
-from flask import Blueprint
-
 from core.helpers import api_method, OrderDirection
-from core.adapters.bittrex import send_order, cancel_order, get_open_orders
-
-blueprint = Blueprint('bittrex_market_v1.1', __name__, url_prefix='/bittrex.com/api/v1.1/market')
+from core.adapters.bittrex import send_order, send_orders, cancel_order, cancel_orders, get_open_orders, throttle, \
+    count_bulk_items
 
 
-@blueprint.route('/buylimit', methods=['GET'])
 @api_method
+@throttle('order')
 def buylimit():
     return send_order(OrderDirection.BUY.value)
 
 
-@blueprint.route('/selllimit')
 @api_method
+@throttle('order')
 def selllimit():
     return send_order(OrderDirection.SELL.value)
 
 
-@blueprint.route('/cancel')
 @api_method
+@throttle('cancel')
 def cancel():
     return cancel_order()
 
 
-@blueprint.route('/getopenorders')
 @api_method
+@throttle('query')
 def getopenorders():
     return get_open_orders()
+
+
+@api_method
+@throttle('bulk', count_bulk_items)
+def placeorders():
+    return send_orders()
+
+
+@api_method
+@throttle('bulk', count_bulk_items)
+def cancelorders():
+    return cancel_orders()
@@ -1,13 +1,8 @@
-from flask import Blueprint
-
-from core.cache import cache
+from core.cache import cached_response
 from core.helpers import proxy_request
-from blueprints.bittrex.converters import trim_t_market
-
-blueprint = Blueprint('bittrex_account_v2.0', __name__, url_prefix='/bittrex.com/Api/v2.0/pub/market')
+from core.adapters.bittrex import trim_t_market
 
 
-@blueprint.route('/GetTicks', methods=['GET'])
-@cache.cached(timeout=60)
+@cached_response(timeout=60)
 def get_ticks():
     return proxy_request(preprocess_params=dict(marketName=trim_t_market))
@@ -4,3 +4,51 @@ INFINITE_BALANCES = True
 
 CACHE_TYPE = 'simple'
 MONGO_URI = 'mongodb://localhost:27017/testex'
+
+EXCHANGE_ADAPTERS = [
+    'blueprints.bittrex.adapter',
+]
+
+# New markets are spread over this many orders collections (at most 256), existing placements never move.
+# Queries without a market or uuid read every collection, so only raise it when the collections
+# live on separate shards of a sharded cluster
+ORDER_SHARDS = 1
+
+# Client order ids remembered in memory for repeated submissions
+DEDUPE_MAXSIZE = 100000
+DEDUPE_TTL = 3600
+
+# Append-only order event log, one set of segments per process
+EVENT_LOG_PATH = 'var/events'
+EVENT_LOG_SEGMENT_SIZE = 64 * 1024 * 1024
+
+# Recent fills kept in memory per account and per market, only used with FILLS_SINGLE_PROCESS
+FILL_BUFFER_SIZE = 10000
+# Set when a single process records all fills, so recent ones are answered from memory
+FILLS_SINGLE_PROCESS = False
+# Mix simulated fills into the upstream getmarkethistory
+BLEND_MARKET_HISTORY = True
+
+# Caches are written here periodically and restored at startup
+CACHE_SNAPSHOT_PATH = 'var/cache.snapshot'
+CACHE_SNAPSHOT_INTERVAL = 60
+
+# Token bucket per api key and route class, tokens per second and bucket size
+ADMISSION_RATE = 10
+ADMISSION_BURST = 20
+# Tokens taken per request of each route class, bulk requests pay per order or uuid,
+# so a batch holds at most ADMISSION_BURST / bulk items
+ADMISSION_WEIGHTS = dict(order=1, cancel=1, query=2, bulk=1)
+# Requests shed immediately once this many limited requests are being processed
+ADMISSION_MAX_IN_FLIGHT = 64
+
+# Admin endpoints (profiler, slow requests) require this value in the admintoken header
+ADMIN_TOKEN = None
+PROFILER_INTERVAL = 0.005
+PROFILER_MAX_DURATION = 300
+SLOW_REQUESTS_SIZE = 100
+
+# Import every view at startup instead of on its first request
+EAGER_VIEWS = False
+# Orders crossing the upstream ticker fill right away at the upstream bid/ask
+EXECUTE_MARKETABLE_ORDERS = False
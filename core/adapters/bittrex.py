@@ -2,20 +2,34 @@ import codecs
 import hashlib
 import requests
 import hmac
+import logging
 import simplejson as json
 from uuid import uuid4, UUID
-from flask import request
+from flask import current_app, g, request
 from enum import Enum
-from decimal import Decimal, InvalidOperation
+from threading import Lock
 from cachetools import TTLCache, cached
-from datetime import datetime
-from bson.decimal128 import Decimal128
+from datetime import datetime, timedelta
 
+from core import money
+from core.admission import admission
+from core.cache import SnapshotTTLCache, snapshot
 from core.helpers import ApiError, OrderStatus, OrderDirection
-from core.database import mongo
-
-MIN_TRADE_VALUE = Decimal('0.001')  # BTC
-TRADE_FEE_PCT = Decimal('0.0025')
+from core.profiler import phase
+from core.sharding import shards
+from core.dedupe import dedupe
+from core.events import events, OrderEventType
+from core.execution import execute_order
+from core.fills import fills
+
+MIN_TRADE_VALUE = money.parse('0.001')  # BTC
+MAX_CLIENT_ORDER_ID_LENGTH = 64
+MAX_BULK_ORDERS = 500
+MARKET_HISTORY_WINDOW = 3600  # seconds of simulated fills blended into getmarkethistory
+FILLS_DEFAULT_WINDOW = timedelta(days=1)
+FILLS_MAX_WINDOW = timedelta(days=31)
+TRADE_FEE_RATE = money.parse('0.0025')
+TICKER_TIMEOUT = 2  # seconds, the ticker is read on the order path
 
 
 class BittrexOrderType(Enum):
@@ -50,6 +64,14 @@ class BittrexErrorMessage(Enum):
     UUID_NOT_PROVIDED = 'UUID_NOT_PROVIDED'
     UUID_INVALID = 'UUID_INVALID'
     INVALID_ORDER = 'INVALID_ORDER'
+    CLIENT_ORDER_ID_INVALID = 'CLIENT_ORDER_ID_INVALID'
+    TIMESTAMP_INVALID = 'TIMESTAMP_INVALID'
+    THROTTLED = 'THROTTLED'
+    ORDERS_NOT_PROVIDED = 'ORDERS_NOT_PROVIDED'
+    ORDERS_INVALID = 'ORDERS_INVALID'
+    ORDER_TYPE_INVALID = 'ORDER_TYPE_INVALID'
+    ORDER_NOT_PLACED = 'ORDER_NOT_PLACED'
+    MARKET_NOT_ALLOWED = 'MARKET_NOT_ALLOWED'
 
 
 class BittrexApiError(ApiError):
@@ -66,6 +88,10 @@ class BittrexApiError(ApiError):
         )
 
 
+def throttle(route_class, get_count=None):
+    return admission.limit(route_class, lambda: BittrexApiError(BittrexErrorMessage.THROTTLED.value), get_count)
+
+
 def get_response(result):
     return dict(
         success=True,
@@ -90,17 +116,38 @@ def trim_t_market(market):
     return '-'.join(map(trim_t, market.split('-')))
 
 
-@cached(TTLCache(ttl=3600, maxsize=128))
+markets_cache = snapshot.register('bittrex_markets', SnapshotTTLCache(ttl=3600, maxsize=128))
+market_history_cache = snapshot.register('bittrex_market_history', SnapshotTTLCache(ttl=60, maxsize=128))
+
+
+@cached(markets_cache, lock=markets_cache.lock)
 def get_markets():
-    res = requests.get('https://bittrex.com/api/v1.1/public/getmarkets')
+    with phase('upstream'):
+        res = requests.get('https://bittrex.com/api/v1.1/public/getmarkets')
     data = json.loads(res.text, use_decimal=True)
     markets = {
-        item['MarketName']: item
+        item['MarketName']: dict(item, _min_trade_size=money.from_decimal(item['MinTradeSize']))
         for item in data['result']
     }
     return markets
 
 
+@cached(market_history_cache, lock=market_history_cache.lock)
+def get_upstream_market_history(market):
+    with phase('upstream'):
+        res = requests.get('https://bittrex.com/api/v1.1/public/getmarkethistory', params=dict(market=market))
+    return json.loads(res.text, use_decimal=True)
+
+
+@cached(TTLCache(ttl=5, maxsize=1024), lock=Lock())
+def get_ticker(market):
+    with phase('upstream'):
+        res = requests.get(
+            'https://bittrex.com/api/v1.1/public/getticker', params=dict(market=market), timeout=TICKER_TIMEOUT)
+    data = json.loads(res.text, use_decimal=True)
+    return data['result'] if data['success'] else None
+
+
 def get_api_key():
     if not request.args.get('nonce'):
         raise BittrexApiError(BittrexErrorMessage.NONCE_NOT_PROVIDED.value)
@@ -114,11 +161,13 @@ def get_api_key():
     if not apisign:
         raise BittrexApiError(BittrexErrorMessage.APISIGN_NOT_PROVIDED.value)
 
-    signature = hmac.new(
-        key=codecs.encode(apisecret),
-        msg=codecs.encode(request.url, 'utf-8'),
-        digestmod=hashlib.sha512
-    ).hexdigest()
+    with phase('auth'):
+        # The body of the bulk POST endpoints is signed right after the url
+        signature = hmac.new(
+            key=codecs.encode(apisecret),
+            msg=codecs.encode(request.url + request.get_data(as_text=True), 'utf-8'),
+            digestmod=hashlib.sha512
+        ).hexdigest()
     if signature != apisign:
         raise BittrexApiError(BittrexErrorMessage.INVALID_SIGNATURE.value)
 
@@ -131,9 +180,12 @@ def get_market(optional=False):
             return
         raise BittrexApiError(BittrexErrorMessage.MARKET_NOT_PROVIDED.value)
 
-    market = trim_t(request.args['market'])
-    markets = get_markets()
-    if market not in markets:
+    return check_market(request.args['market'])
+
+
+def check_market(name):
+    market = trim_t_market(name)
+    if market not in get_markets():
         raise BittrexApiError(BittrexErrorMessage.INVALID_MARKET.value)
 
     return market
@@ -144,8 +196,8 @@ def get_amount():
         raise BittrexApiError(BittrexErrorMessage.QUANTITY_NOT_PROVIDED.value)
 
     try:
-        amount = Decimal(request.args['quantity'])
-    except InvalidOperation:
+        amount = money.parse(request.args['quantity'])
+    except ValueError:
         raise BittrexApiError(BittrexErrorMessage.QUANTITY_INVALID.value)
 
     return amount
@@ -156,13 +208,65 @@ def get_price():
         raise BittrexApiError(BittrexErrorMessage.RATE_NOT_PROVIDED.value)
 
     try:
-        price = Decimal(request.args['rate'])
-    except InvalidOperation:
+        price = money.parse(request.args['rate'])
+    except ValueError:
         raise BittrexApiError(BittrexErrorMessage.RATE_INVALID.value)
 
     return price
 
 
+def parse_bulk_value(item, key, not_provided, invalid):
+    if not item.get(key):
+        raise BittrexApiError(not_provided.value)
+
+    # true, NaN, lists and objects are all invalid, only strings and numbers (kept as strings) parse
+    if not isinstance(item[key], str):
+        raise BittrexApiError(invalid.value)
+
+    try:
+        return money.parse(item[key])
+    except ValueError:
+        raise BittrexApiError(invalid.value)
+
+
+def get_bulk_items():
+    """JSON list from the request body, parsed once per request, None if there is no body.
+
+    A batch may not hold more items than one token bucket, see count_bulk_items.
+    """
+    if 'bulk_items' not in g:
+        body = request.get_data(as_text=True)
+        items = None
+        if body:
+            try:
+                # Numbers stay strings so they are parsed exactly like the single order arguments
+                items = json.loads(body, parse_float=str, parse_int=str)
+            except ValueError:
+                raise BittrexApiError(BittrexErrorMessage.ORDERS_INVALID.value)
+
+            max_items = min(MAX_BULK_ORDERS, admission.get_max_count('bulk'))
+            if not isinstance(items, list) or not 0 < len(items) <= max_items:
+                raise BittrexApiError(BittrexErrorMessage.ORDERS_INVALID.value)
+        g.bulk_items = items
+    return g.bulk_items
+
+
+def count_bulk_items():
+    """Bulk requests are charged per order or uuid, a cancel-all counts as one."""
+    return len(get_bulk_items() or ()) or 1
+
+
+def get_bulk_orders():
+    items = get_bulk_items()
+    if not items:
+        raise BittrexApiError(BittrexErrorMessage.ORDERS_NOT_PROVIDED.value)
+
+    if not all(isinstance(item, dict) for item in items):
+        raise BittrexApiError(BittrexErrorMessage.ORDERS_INVALID.value)
+
+    return items
+
+
 def get_order_number():
     if not request.args.get('uuid'):
         raise BittrexApiError(BittrexErrorMessage.UUID_NOT_PROVIDED.value)
@@ -175,34 +279,204 @@ def get_order_number():
     return request.args['uuid']
 
 
-def send_order(direction):
-    api_key = get_api_key()
-    market = get_market()
-    amount = get_amount()
-    price = get_price()
+def get_order_numbers():
+    """Order uuids from the JSON list in the request body, None if there is no body."""
+    numbers = get_bulk_items()
+    if not numbers:
+        return
+
+    for number in numbers:
+        try:
+            UUID(number)
+        except (ValueError, TypeError, AttributeError):
+            raise BittrexApiError(BittrexErrorMessage.UUID_INVALID.value)
+
+    return numbers
+
+
+def get_timestamp(key):
+    if not request.args.get(key):
+        return
+
+    try:
+        return datetime.strptime(request.args[key], '%Y-%m-%dT%H:%M:%S')
+    except ValueError:
+        raise BittrexApiError(BittrexErrorMessage.TIMESTAMP_INVALID.value)
 
-    min_trade_size = get_markets()[market]['MinTradeSize']
+
+def check_client_order_id(client_order_id):
+    if not isinstance(client_order_id, str) or not client_order_id \
+            or len(client_order_id) > MAX_CLIENT_ORDER_ID_LENGTH:
+        raise BittrexApiError(BittrexErrorMessage.CLIENT_ORDER_ID_INVALID.value)
+
+    return client_order_id
+
+
+def get_client_order_id():
+    client_order_id = request.args.get('clientorderid')
+    if client_order_id is None:
+        return
+
+    return check_client_order_id(client_order_id)
+
+
+def make_order(api_key, direction, market, amount, price, client_order_id=None):
+    min_trade_size = get_markets()[market]['_min_trade_size']
     if amount < min_trade_size:
         raise BittrexApiError(BittrexErrorMessage.MIN_TRADE_REQUIREMENT_NOT_MET.value)
 
-    if amount * price < MIN_TRADE_VALUE:
+    if money.mul(amount, price) < MIN_TRADE_VALUE:
         raise BittrexApiError(BittrexErrorMessage.DUST_TRADE_DISALLOWED_MIN_VALUE_50K_SAT.value)
 
     order = dict(
-        _id=str(uuid4()),
+        _id=shards.make_id(market),
         _user=api_key,
         opened_at=datetime.utcnow(),
         direction=direction,
-        amount=Decimal128(amount),
-        price=Decimal128(price),
+        amount=amount,
+        price=price,
         market=market,
         status=OrderStatus.OPENED.value
     )
+    if client_order_id:
+        order['client_order_id'] = client_order_id
+
+    return order
+
+
+def make_bulk_order(api_key, item):
+    direction = item.get('type')
+    if direction not in (OrderDirection.BUY.value, OrderDirection.SELL.value):
+        raise BittrexApiError(BittrexErrorMessage.ORDER_TYPE_INVALID.value)
+
+    if not item.get('market'):
+        raise BittrexApiError(BittrexErrorMessage.MARKET_NOT_PROVIDED.value)
+
+    market = check_market(str(item['market']))
+
+    amount = parse_bulk_value(
+        item, 'quantity', BittrexErrorMessage.QUANTITY_NOT_PROVIDED, BittrexErrorMessage.QUANTITY_INVALID)
+    price = parse_bulk_value(
+        item, 'rate', BittrexErrorMessage.RATE_NOT_PROVIDED, BittrexErrorMessage.RATE_INVALID)
+
+    client_order_id = item.get('clientorderid')
+    if client_order_id is not None:
+        check_client_order_id(client_order_id)
+
+    return make_order(api_key, direction, market, amount, price, client_order_id)
+
+
+def log_opened(order):
+    events.append(
+        OrderEventType.OPENED, order['_id'],
+        user=order['_user'],
+        market=order['market'],
+        direction=order['direction'],
+        amount=order['amount'],
+        price=order['price']
+    )
+
+
+def execute_marketable(order):
+    """Fill an order that crosses the upstream ticker right away, at the upstream price.
+
+    The order is already stored, so any failure here leaves it open instead of failing the request.
+    """
+    if not current_app.config.get('EXECUTE_MARKETABLE_ORDERS'):
+        return
+
+    try:
+        ticker = get_ticker(order['market'])
+        if not ticker:
+            return
+
+        if order['direction'] == OrderDirection.BUY.value:
+            price = ticker['Ask'] and money.from_decimal(ticker['Ask'])
+            if price and order['price'] >= price:
+                execute_order(order, order['amount'], price, TRADE_FEE_RATE)
+        else:
+            price = ticker['Bid'] and money.from_decimal(ticker['Bid'])
+            if price and order['price'] <= price:
+                execute_order(order, order['amount'], price, TRADE_FEE_RATE)
+    except Exception as e:
+        logging.warning('order {} left open, failed to execute it: {}'.format(order['_id'], e))
+
+
+def send_order(direction):
+    api_key = get_api_key()
+    market = get_market()
+    client_order_id = get_client_order_id()
+    if client_order_id:
+        uuid = dedupe.get(api_key, market, client_order_id)
+        if uuid:
+            return get_response(dict(uuid=uuid))
+
+    amount = get_amount()
+    price = get_price()
+    order = make_order(api_key, direction, market, amount, price, client_order_id)
+
     # TODO: connection reset here (with prob)
-    mongo.db.orders.insert_one(order)
+    uuid = shards.run(market, dedupe.insert_order, order)
     # TODO: and here (with prob too)
+    if client_order_id:
+        dedupe.set(api_key, market, client_order_id, uuid)
 
-    return get_response(dict(uuid=order['_id']))
+    if uuid == order['_id']:
+        log_opened(order)
+        execute_marketable(order)
+
+    return get_response(dict(uuid=uuid))
+
+
+def send_orders():
+    api_key = get_api_key()
+    items = get_bulk_orders()
+
+    results = [None] * len(items)
+    pending = []  # (index, order) to insert
+    repeated = []  # (index, order) reusing a client order id from earlier in the batch
+    batch_orders = {}
+    for index, item in enumerate(items):
+        try:
+            order = make_bulk_order(api_key, item)
+        except BittrexApiError as e:
+            results[index] = e.get_response()
+            continue
+
+        client_order_id = order.get('client_order_id')
+        key = (order['market'], client_order_id)
+        uuid = dedupe.get(api_key, *key) if client_order_id else None
+        if uuid:
+            results[index] = get_response(dict(uuid=uuid))
+        elif key in batch_orders:
+            repeated.append((index, batch_orders[key]))
+        else:
+            pending.append((index, order))
+            if client_order_id:
+                batch_orders[key] = order
+
+    index_of = {order['_id']: index for index, order in pending}
+    stored = {}
+    for uuids in shards.run_by_market(dedupe.insert_orders, [order for _, order in pending]):
+        stored.update(uuids)
+
+    for index, order in pending:
+        uuid = stored[order['_id']]
+        if uuid is None:
+            results[index] = BittrexApiError(BittrexErrorMessage.ORDER_NOT_PLACED.value).get_response()
+            continue
+
+        results[index] = get_response(dict(uuid=uuid))
+        if order.get('client_order_id'):
+            dedupe.set(api_key, order['market'], order['client_order_id'], uuid)
+        if uuid == order['_id']:
+            log_opened(order)
+            execute_marketable(order)
+
+    for index, order in repeated:
+        results[index] = results[index_of[order['_id']]]
+
+    return get_response(results)
 
 
 def cancel_order():
@@ -210,110 +484,184 @@ def cancel_order():
     number = get_order_number()
     query = dict(_id=number, _user=api_key)
 
-    order = mongo.db.orders.find_one(query)
+    order = shards.find_one(query)
     if not order:
         raise BittrexApiError(BittrexErrorMessage.INVALID_ORDER.value)
 
     if order['status'] != OrderStatus.OPENED.value:
         raise BittrexApiError(BittrexErrorMessage.ORDER_NOT_OPEN.value)
 
-    mongo.db.orders.update_one(
+    shards.run(order['market'], lambda orders: orders.update_one(
         query,
-        dict(
+        {'$set': dict(
             status=OrderStatus.CANCELED.value,
             closed_at=datetime.utcnow()
-        ),
+        )},
         upsert=False
-    )
+    ))
+    events.append(OrderEventType.CANCELED, number, market=order['market'])
 
     return get_response(None)
 
 
-def format_datetime(dt):
-    return dt.strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3]
+def cancel_opened(orders, batch, closed_at):
+    orders.update_many(
+        {'_id': {'$in': [order['_id'] for order in batch]}, 'status': OrderStatus.OPENED.value},
+        {'$set': dict(
+            status=OrderStatus.CANCELED.value,
+            closed_at=closed_at
+        )}
+    )
 
 
-def order_get_decimal(order, key, default=Decimal()) -> Decimal:
-    value = order.get(key)
-    return value.to_decimal() if value else default
+def cancel_orders():
+    api_key = get_api_key()
+    numbers = get_order_numbers()
+    cancel_all = request.args.get('all') == 'true'
+    query = dict(_user=api_key)
+    if numbers:
+        if cancel_all:
+            raise BittrexApiError(BittrexErrorMessage.ORDERS_INVALID.value)
+        if request.args.get('market'):
+            raise BittrexApiError(BittrexErrorMessage.MARKET_NOT_ALLOWED.value)
+        query['_id'] = {'$in': numbers}
+    else:
+        # An empty body alone never cancels anything, a dropped body must not wipe the book
+        if not cancel_all:
+            raise BittrexApiError(BittrexErrorMessage.ORDERS_NOT_PROVIDED.value)
+        query['status'] = OrderStatus.OPENED.value
+        market = get_market(optional=True)
+        if market:
+            query['market'] = market
+
+    orders = {order['_id']: order for order in shards.find(query)}
+    opened = [order for order in orders.values() if order['status'] == OrderStatus.OPENED.value]
+    shards.run_by_market(cancel_opened, opened, datetime.utcnow())
+    for order in opened:
+        events.append(OrderEventType.CANCELED, order['_id'], market=order['market'])
+
+    results = []
+    for number in numbers or [order['_id'] for order in opened]:
+        if number not in orders:
+            result = BittrexApiError(BittrexErrorMessage.INVALID_ORDER.value).get_response()
+        elif orders[number]['status'] != OrderStatus.OPENED.value:
+            result = BittrexApiError(BittrexErrorMessage.ORDER_NOT_OPEN.value).get_response()
+        else:
+            result = get_response(None)
+        results.append(dict(result, result=dict(uuid=number)))
+
+    return get_response(results)
+
+
+def format_datetime(dt):
+    return dt.strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3]
 
 
 def format_open_order(order) -> dict:
-    amount = order_get_decimal(order, 'amount')
+    amount = money.get_field(order, 'amount')
     result = {
         'CancelInitiated': False,  # TODO: implement
         'Closed': None,
-        'CommissionPaid': order_get_decimal(order, 'fee'),
+        'CommissionPaid': money.to_decimal(money.get_field(order, 'fee')),
         'Condition': 'NONE',
         'ConditionTarget': None,
         'Exchange': order['market'],
         'ImmediateOrCancel': False,
         'IsConditional': False,
-        'Limit': order_get_decimal(order, 'price'),
+        'Limit': money.to_decimal(money.get_field(order, 'price')),
         'Opened': format_datetime(order['opened_at']),
         'OrderType': BittrexOrderType.from_direction(order['direction']),
         'OrderUuid': order['_id'],
-        'Price': Decimal(),
+        'Price': money.to_decimal(0),
         'PricePerUnit': None,
-        'Quantity': amount,
-        'QuantityRemaining': amount - order_get_decimal(order, 'executed_amount'),
+        'Quantity': money.to_decimal(amount),
+        'QuantityRemaining': money.to_decimal(amount - money.get_field(order, 'executed_amount')),
         'Uuid': None
     }
     return result
 
 
 def format_history_order(order) -> dict:
-    amount = order_get_decimal(order, 'amount')
+    amount = money.get_field(order, 'amount')
     result = {
         'Closed': format_datetime(order['closed_at']),
-        'Commission': order_get_decimal(order, 'fee'),
+        'Commission': money.to_decimal(money.get_field(order, 'fee')),
         'Condition': 'NONE',
         'ConditionTarget': None,
         'Exchange': order['market'],
         'ImmediateOrCancel': False,
         'IsConditional': False,
-        'Limit': order_get_decimal(order, 'price'),
+        'Limit': money.to_decimal(money.get_field(order, 'price')),
         'OrderType': BittrexOrderType.from_direction(order['direction']),
         'OrderUuid': order['_id'],
-        'Price': order_get_decimal(order, 'total'),
-        'PricePerUnit': order_get_decimal(order, 'executed_price'),
-        'Quantity': amount,
-        'QuantityRemaining': amount - order_get_decimal(order, 'executed_amount'),
+        'Price': money.to_decimal(money.get_field(order, 'total')),
+        'PricePerUnit': money.to_decimal(money.get_field(order, 'executed_price')),
+        'Quantity': money.to_decimal(amount),
+        'QuantityRemaining': money.to_decimal(amount - money.get_field(order, 'executed_amount')),
         'TimeStamp': format_datetime(order['opened_at'])
     }
     return result
 
 
+def format_fill(fill) -> dict:
+    result = {
+        'Commission': money.to_decimal(fill['fee']),
+        'Exchange': fill['market'],
+        'FillId': fill['_id'],
+        'OrderType': BittrexOrderType.from_direction(fill['direction']),
+        'OrderUuid': fill['order'],
+        'Price': money.to_decimal(fill['total']),
+        'PricePerUnit': money.to_decimal(fill['price']),
+        'Quantity': money.to_decimal(fill['quantity']),
+        'TimeStamp': format_datetime(fill['ts'])
+    }
+    return result
+
+
+def format_market_fill(fill) -> dict:
+    result = {
+        'FillType': 'FILL',
+        'Id': fill['_id'],
+        'OrderType': fill['direction'].upper(),
+        'Price': money.to_decimal(fill['price']),
+        'Quantity': money.to_decimal(fill['quantity']),
+        'TimeStamp': format_datetime(fill['ts']),
+        'Total': money.to_decimal(fill['total'])
+    }
+    return result
+
+
 def format_single_order(order) -> dict:
     is_closed = order['status'] in [OrderStatus.FILLED.value, OrderStatus.CANCELED.value]
-    price = order_get_decimal(order, 'price')
-    amount = order_get_decimal(order, 'amount')
-    fee = order_get_decimal(order, 'fee')
-    reserved = price * amount
-    fee_reserved = reserved * TRADE_FEE_PCT
-    executed_amount = order_get_decimal(order, 'executed_amount')
+    price = money.get_field(order, 'price')
+    amount = money.get_field(order, 'amount')
+    fee = money.get_field(order, 'fee')
+    reserved = money.mul(price, amount)
+    fee_reserved = money.mul(reserved, TRADE_FEE_RATE)
+    executed_amount = money.get_field(order, 'executed_amount')
+    executed_price = money.get_field(order, 'executed_price', None)
     result = {
         'AccountId': None,
         'CancelInitiated': False,
         'Closed': format_datetime(order['closed_at']) if is_closed else None,
-        'CommissionPaid': fee,
-        'CommissionReserveRemaining': fee_reserved - fee,
-        'CommissionReserved': fee_reserved,
+        'CommissionPaid': money.to_decimal(fee),
+        'CommissionReserveRemaining': money.to_decimal(fee_reserved - fee),
+        'CommissionReserved': money.to_decimal(fee_reserved),
         'Condition': 'NONE',
         'ConditionTarget': None,
         'Exchange': order['market'],
         'ImmediateOrCancel': False,
         'IsConditional': False,
         'IsOpen': not is_closed,
-        'Limit': price,
+        'Limit': money.to_decimal(price),
         'Opened': format_datetime(order['opened_at']),
         'OrderUuid': order['_id'],
-        'Price': order_get_decimal(order, 'total'),
-        'PricePerUnit': order_get_decimal(order, 'executed_price', None),
-        'Quantity': amount,
-        'QuantityRemaining': amount - executed_amount,
-        'ReserveRemaining': reserved - executed_amount * price,
-        'Reserved': reserved,
+        'Price': money.to_decimal(money.get_field(order, 'total')),
+        'PricePerUnit': money.to_decimal(executed_price) if executed_price is not None else None,
+        'Quantity': money.to_decimal(amount),
+        'QuantityRemaining': money.to_decimal(amount - executed_amount),
+        'ReserveRemaining': money.to_decimal(reserved - money.mul(executed_amount, price)),
+        'Reserved': money.to_decimal(reserved),
         'Sentinel': str(uuid4()),  # TODO: what is this
         'Type': BittrexOrderType.from_direction(order['direction']),
     }
@@ -328,7 +676,7 @@ def get_open_orders():
     if market:
         query['market'] = market
 
-    orders = mongo.db.orders.find(query)
+    orders = shards.find(query)
 
     return get_response(list(map(format_open_order, orders)))
 
@@ -337,7 +685,7 @@ def get_order():
     api_key = get_api_key()
     number = get_order_number()
 
-    order = mongo.db.find_one(dict(_id=number, _user=api_key))
+    order = shards.find_one(dict(_id=number, _user=api_key))
     if not order:
         raise BittrexApiError(BittrexErrorMessage.INVALID_ORDER.value)
 
@@ -352,6 +700,31 @@ def get_order_history():
     if market:
         query['market'] = market
 
-    orders = mongo.db.orders.find(query)
+    orders = shards.find(query)
 
     return get_response(list(map(format_history_order, orders)))
+
+
+def get_fills():
+    api_key = get_api_key()
+    market = get_market(optional=True)
+    end = get_timestamp('end') or datetime.utcnow()
+    start = get_timestamp('start') or end - FILLS_DEFAULT_WINDOW
+    if start >= end or end - start > FILLS_MAX_WINDOW:
+        raise BittrexApiError(BittrexErrorMessage.TIMESTAMP_INVALID.value)
+
+    return get_response(list(map(format_fill, fills.find(start, end, user=api_key, market=market))))
+
+
+def get_market_history():
+    market = get_market()
+    data = get_upstream_market_history(market)
+    if not data['success'] or not current_app.config['BLEND_MARKET_HISTORY']:
+        return data
+
+    history = data['result']
+    since = datetime.utcnow() - timedelta(seconds=MARKET_HISTORY_WINDOW)
+    history = list(map(format_market_fill, reversed(fills.find(since, market=market)))) + history
+    history.sort(key=lambda item: item['TimeStamp'], reverse=True)
+
+    return get_response(history[:len(data['result']) or None])
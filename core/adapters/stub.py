@@ -1,13 +1,17 @@
 from decimal import Decimal
-from cachetools import TTLCache, cached
+from cachetools import cached
+from cachetools.keys import hashkey
 from enum import Enum
 from uuid import uuid4
 from bson import Decimal128
 from datetime import datetime
 
 from core.adapters.wrapper import BittrexApi, BittrexApiError, BittrexErrorMessage
+from core.cache import SnapshotTTLCache, snapshot
 from core.helpers import OrderDirection, OrderStatus
 
+markets_cache = snapshot.register('bittrex_stub_markets', SnapshotTTLCache(ttl=3600, maxsize=128))
+
 
 class BittrexOrderType(Enum):
     BUY_LIMIT = 'BUY_LIMIT'
@@ -34,7 +38,7 @@ class BittrexApiStub(BittrexApi):
     min_trade_value = Decimal('0.001')  # BTC
 
     @property
-    @cached(TTLCache(ttl=3600, maxsize=128))
+    @cached(markets_cache, key=lambda self: hashkey(self.public.base_url), lock=markets_cache.lock)
     def markets(self) -> dict:
         data = self.public.getmarkets()
         return {
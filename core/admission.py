@@ -0,0 +1,87 @@
+import time
+from functools import wraps
+from threading import Lock
+from cachetools import TTLCache
+from flask import request
+
+
+class TokenBucket:
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated_at = time.monotonic()
+
+    def take(self, cost):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        if self.tokens < cost:
+            return False
+        self.tokens -= cost
+        return True
+
+
+class AdmissionControl:
+    """Rejects requests before any auth or database work when an api key exceeds its rate
+    for a route class, or when too many requests are already being processed."""
+
+    def __init__(self, rate=10, burst=20, weights=None, max_in_flight=64):
+        self.rate = rate
+        self.burst = burst
+        self.weights = weights or {}
+        self.max_in_flight = max_in_flight
+        self.in_flight = 0
+        # Buckets of keys idle for longer than a refill are dropped, they would be full again anyway
+        self.buckets = TTLCache(maxsize=100000, ttl=max(1, burst / rate))
+        self.lock = Lock()
+
+    def init_app(self, app):
+        self.rate = app.config.get('ADMISSION_RATE', self.rate)
+        self.burst = app.config.get('ADMISSION_BURST', self.burst)
+        self.weights = app.config.get('ADMISSION_WEIGHTS', self.weights)
+        self.max_in_flight = app.config.get('ADMISSION_MAX_IN_FLIGHT', self.max_in_flight)
+        self.buckets = TTLCache(maxsize=self.buckets.maxsize, ttl=max(1, self.burst / self.rate))
+
+    def get_max_count(self, route_class):
+        """Most items one request of the route class can be charged for, a bucket never holds more."""
+        return int(self.burst // self.weights.get(route_class, 1))
+
+    def acquire(self, key, route_class, count=1):
+        with self.lock:
+            if self.in_flight >= self.max_in_flight:
+                return False
+
+            bucket = self.buckets.get((key, route_class))
+            if bucket is None:
+                bucket = TokenBucket(self.rate, self.burst)
+            # Re-inserting refreshes the idle TTL
+            self.buckets[key, route_class] = bucket
+            if not bucket.take(self.weights.get(route_class, 1) * count):
+                return False
+
+            self.in_flight += 1
+            return True
+
+    def release(self):
+        with self.lock:
+            self.in_flight -= 1
+
+    def limit(self, route_class, make_error, get_count=None):
+        """Charge the route class weight per request, or per item when get_count is given."""
+        def decorator(f):
+            @wraps(f)
+            def decorated_function(*args, **kwargs):
+                count = get_count() if get_count else 1
+                if not self.acquire(request.args.get('apikey'), route_class, count):
+                    raise make_error()
+                try:
+                    return f(*args, **kwargs)
+                finally:
+                    self.release()
+            return decorated_function
+        return decorator
+
+
+admission = AdmissionControl()
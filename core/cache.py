@@ -1,3 +1,180 @@
+import atexit
+import hashlib
+import logging
+import os
+import pickle
+import time
+from datetime import datetime
+from functools import wraps
+from threading import RLock, Timer
+from cachetools import TTLCache
+from flask import Response, make_response, request
 from flask_cache import Cache
+from werkzeug.contrib.cache import SimpleCache
 
 cache = Cache()
+
+
+def cached_response(timeout):
+    """Cache a view's rendered body together with its ETag and Last-Modified.
+
+    The hash is computed once per cache fill, and conditional requests matching the cached
+    entry get 304 Not Modified without running the view or re-sending the body.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            key = 'response/{}'.format(request.full_path)
+            entry = cache.get(key)
+            if entry is None:
+                response = make_response(f(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                body = response.get_data()
+                entry = dict(
+                    body=body,
+                    content_type=response.content_type,
+                    etag=hashlib.sha1(body).hexdigest(),
+                    last_modified=datetime.utcnow().replace(microsecond=0)
+                )
+                cache.set(key, entry, timeout=timeout)
+
+            response = Response(entry['body'], content_type=entry['content_type'])
+            response.set_etag(entry['etag'])
+            response.last_modified = entry['last_modified']
+            return response.make_conditional(request)
+        return decorated_function
+    return decorator
+
+
+class SnapshotTTLCache(TTLCache):
+    """TTLCache that can be dumped to a snapshot and restored with the entries' remaining TTL."""
+
+    def __init__(self, maxsize, ttl, getsizeof=None):
+        self.offset = 0
+        self.stored_at = {}
+        self.lock = RLock()
+        super(SnapshotTTLCache, self).__init__(maxsize, ttl, timer=self.get_time, getsizeof=getsizeof)
+
+    def get_time(self):
+        return time.time() - self.offset
+
+    def __setitem__(self, key, value):
+        super(SnapshotTTLCache, self).__setitem__(key, value)
+        self.stored_at[key] = self.get_time()
+
+    def dump(self):
+        with self.lock:
+            now = time.time()
+            items = []
+            for key in list(self):
+                try:
+                    items.append((key, self[key], self.stored_at.get(key, now)))
+                except KeyError:
+                    pass  # expired since listing
+            self.stored_at = {key: stored_at for key, _, stored_at in items}
+        return items
+
+    def restore(self, items):
+        now = time.time()
+        with self.lock:
+            for key, value, stored_at in items:
+                if now - stored_at >= self.ttl:
+                    continue
+                # Back-date the insert so the entry expires when it would have without the restart
+                self.offset = now - stored_at
+                try:
+                    self[key] = value
+                finally:
+                    self.offset = 0
+
+
+class SimpleCacheSnapshot:
+    """Dumps werkzeug's SimpleCache (Flask-Cache 'simple' type), whose values are already pickled."""
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def dump(self):
+        return list(self.backend._cache.items())
+
+    def restore(self, items):
+        now = time.time()
+        for key, (expires, value) in items:
+            # Expiry is an absolute timestamp, so it already accounts for the entry's age
+            if expires == 0 or expires > now:
+                self.backend._cache[key] = (expires, value)
+
+
+class CacheSnapshot:
+    """Periodically writes registered caches to CACHE_SNAPSHOT_PATH and restores them at startup.
+
+    Caches registered after init_app (e.g. in lazily imported views) are restored on registration.
+    """
+
+    def __init__(self):
+        self.path = None
+        self.interval = None
+        self.caches = {}
+        self.loaded = {}
+
+    def init_app(self, app):
+        self.path = app.config.get('CACHE_SNAPSHOT_PATH')
+        self.interval = app.config.get('CACHE_SNAPSHOT_INTERVAL', 60)
+        if not self.path:
+            return
+
+        backend = app.extensions['cache'][cache]
+        if isinstance(backend, SimpleCache):
+            self.register('flask_cache', SimpleCacheSnapshot(backend))
+
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        self.load()
+        for name, item in self.caches.items():
+            item.restore(self.loaded.pop(name, []))
+
+        self.schedule()
+        atexit.register(self.save)
+
+    def register(self, name, item):
+        self.caches[name] = item
+        if name in self.loaded:
+            item.restore(self.loaded.pop(name))
+        return item
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+
+        started_at = time.perf_counter()
+        try:
+            with open(self.path, 'rb') as f:
+                self.loaded = pickle.load(f)
+        except Exception as e:  # any corrupt or incompatible snapshot just means a cold start
+            logging.warning('ignoring cache snapshot {}: {}'.format(self.path, e))
+            return
+        logging.info('loaded cache snapshot in {:.1f}ms'.format((time.perf_counter() - started_at) * 1000))
+
+    def save(self):
+        # Keep entries of caches not registered yet (views not imported since the restart)
+        data = dict(self.loaded)
+        data.update((name, item.dump()) for name, item in self.caches.items())
+        tmp_path = '{}.{}.tmp'.format(self.path, os.getpid())
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.path)
+
+    def schedule(self):
+        timer = Timer(self.interval, self.run)
+        timer.daemon = True
+        timer.start()
+
+    def run(self):
+        try:
+            self.save()
+        except Exception as e:
+            logging.error('failed to save cache snapshot: {}'.format(e))
+        self.schedule()
+
+
+snapshot = CacheSnapshot()
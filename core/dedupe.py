@@ -0,0 +1,91 @@
+import logging
+from threading import Lock
+from cachetools import TTLCache
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from core.sharding import shards
+
+DUPLICATE_KEY_ERROR = 11000
+
+
+class OrderDedupe:
+    """Maps (api key, market, client order id) to the uuid of the order it created.
+
+    Client order ids are unique per market: a market's orders all live in one shard collection,
+    whose unique index enforces it. Recent keys are answered from a bounded in-memory TTL index;
+    older ones fall back to the client_order_id stored on the order itself, with the same result.
+    """
+
+    def __init__(self, maxsize=100000, ttl=3600):
+        self.index = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.lock = Lock()
+
+    def init_app(self, app):
+        self.index = TTLCache(
+            maxsize=app.config.get('DEDUPE_MAXSIZE', self.index.maxsize),
+            ttl=app.config.get('DEDUPE_TTL', self.index.ttl)
+        )
+        shards.add_index(
+            [('_user', 1), ('market', 1), ('client_order_id', 1)],
+            unique=True,
+            partialFilterExpression={'client_order_id': {'$exists': True}}
+        )
+
+    def get(self, api_key, market, client_order_id):
+        with self.lock:
+            return self.index.get((api_key, market, client_order_id))
+
+    def set(self, api_key, market, client_order_id, uuid):
+        with self.lock:
+            self.index[api_key, market, client_order_id] = uuid
+
+    def insert_order(self, orders, order):
+        """Insert the order unless one with the same client order id exists, return the stored uuid.
+
+        The unique index on (_user, market, client_order_id) decides between concurrent retries, whichever
+        process or thread they land on.
+        """
+        try:
+            orders.insert_one(order)
+        except DuplicateKeyError:
+            if not order.get('client_order_id'):
+                raise
+            existing = orders.find_one(dict(
+                _user=order['_user'], market=order['market'], client_order_id=order['client_order_id']))
+            return existing['_id']
+        return order['_id']
+
+    def insert_orders(self, orders, batch):
+        """Bulk version of insert_order for one api key, returns a map of order _id to stored uuid.
+
+        The batch is inserted unordered, so one bad order does not stop the others; orders that
+        failed for any reason other than a repeated client order id map to None.
+        """
+        stored = {order['_id']: order['_id'] for order in batch}
+        try:
+            orders.insert_many(batch, ordered=False)
+        except BulkWriteError as e:
+            duplicates = []
+            for error in e.details['writeErrors']:
+                order = batch[error['index']]
+                if error['code'] == DUPLICATE_KEY_ERROR and order.get('client_order_id'):
+                    duplicates.append(order)
+                else:
+                    logging.error('failed to insert order {}: {}'.format(order['_id'], error.get('errmsg')))
+                    stored[order['_id']] = None
+            if not duplicates:
+                return stored
+
+            query = {'_user': batch[0]['_user'], 'client_order_id': {'$in': [
+                order['client_order_id'] for order in duplicates
+            ]}}
+            existing = {
+                (order['market'], order['client_order_id']): order['_id']
+                for order in orders.find(query, projection=['market', 'client_order_id'])
+            }
+            for order in duplicates:
+                stored[order['_id']] = existing.get((order['market'], order['client_order_id']))
+        return stored
+
+
+dedupe = OrderDedupe()
@@ -0,0 +1,84 @@
+import heapq
+import logging
+import os
+import time
+import simplejson as json
+from enum import Enum
+from threading import Lock
+from uuid import uuid4
+
+SEGMENT_SUFFIX = '.jsonl'
+
+
+class OrderEventType(Enum):
+    OPENED = 'opened'
+    PARTIALLY_FILLED = 'partially_filled'
+    FILLED = 'filled'
+    CANCELED = 'canceled'
+
+
+class OrderEventLog:
+    """Append-only log of order events, one JSON object per line, split into numbered segments.
+
+    Every process writes only its own segments, named by start time, pid, a random writer id and a
+    sequence number. The name is picked on a process's first write, so workers forked after import
+    get their own: workers never share a file and a line torn by a crash is always the last one of
+    its segment. `replay` merges all segments back into a single stream by time.
+    """
+
+    def __init__(self, path=None, segment_size=64 * 1024 * 1024):
+        self.path = path
+        self.segment_size = segment_size
+        self.pid = None
+        self.writer_id = None
+        self.segment_number = 0
+        self.segment = None
+        self.lock = Lock()
+
+    def init_app(self, app):
+        self.path = app.config.get('EVENT_LOG_PATH', self.path)
+        self.segment_size = app.config.get('EVENT_LOG_SEGMENT_SIZE', self.segment_size)
+        if self.path:
+            os.makedirs(self.path, exist_ok=True)
+
+    def get_segments(self):
+        return sorted(name for name in os.listdir(self.path) if name.endswith(SEGMENT_SUFFIX))
+
+    def rotate(self):
+        if self.pid != os.getpid():
+            # First write in this process: never reuse a segment or writer id inherited through fork
+            self.pid = os.getpid()
+            self.writer_id = '{:d}-{:d}-{}'.format(int(time.time() * 1000), self.pid, uuid4().hex[:12])
+            self.segment_number = 0
+        elif self.segment:
+            self.segment.close()
+        self.segment_number += 1
+        name = '{}-{:06d}{}'.format(self.writer_id, self.segment_number, SEGMENT_SUFFIX)
+        self.segment = open(os.path.join(self.path, name), 'a', encoding='utf-8')
+
+    def append(self, event_type, order_id, **fields):
+        if not self.path:
+            return
+
+        event = dict(fields, ts=time.time(), type=event_type.value, order=order_id)
+        line = json.dumps(event, separators=(',', ':')) + '\n'
+        with self.lock:
+            if self.pid != os.getpid() or self.segment.tell() >= self.segment_size:
+                self.rotate()
+            self.segment.write(line)
+            self.segment.flush()
+
+    def read_segment(self, name):
+        with open(os.path.join(self.path, name), encoding='utf-8') as segment:
+            for line in segment:
+                try:
+                    yield json.loads(line, use_decimal=True)
+                except json.JSONDecodeError:
+                    logging.warning('skipping torn event in {}'.format(name))
+
+    def replay(self):
+        """All events from every writer, oldest first."""
+        return heapq.merge(*map(self.read_segment, self.get_segments()), key=lambda event: event['ts'])
+
+
+events = OrderEventLog()
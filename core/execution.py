@@ -0,0 +1,54 @@
+from uuid import uuid4
+from datetime import datetime
+
+from core import money
+from core.helpers import OrderStatus
+from core.sharding import shards
+from core.events import events, OrderEventType
+from core.fills import fills
+
+
+def execute_order(order, quantity: int, price: int, fee_rate: int):
+    """Fill `quantity` of an open order at `price` (fixed point, see core.money): update the order,
+    log the event and store the fill."""
+    now = datetime.utcnow()
+    total = money.mul(quantity, price)
+    fee = money.mul(total, fee_rate)
+    executed_amount = money.get_field(order, 'executed_amount') + quantity
+    executed_total = money.get_field(order, 'total') + total
+    executed_fee = money.get_field(order, 'fee') + fee
+    is_filled = executed_amount >= money.get_field(order, 'amount')
+
+    update = dict(
+        executed_amount=executed_amount,
+        executed_price=money.div(executed_total, executed_amount),
+        total=executed_total,
+        fee=executed_fee
+    )
+    if is_filled:
+        update.update(status=OrderStatus.FILLED.value, closed_at=now)
+    shards.run(order['market'], lambda orders: orders.update_one(dict(_id=order['_id']), {'$set': update}))
+
+    events.append(
+        OrderEventType.FILLED if is_filled else OrderEventType.PARTIALLY_FILLED, order['_id'],
+        market=order['market'],
+        executed_amount=executed_amount,
+        executed_price=update['executed_price'],
+        total=executed_total,
+        fee=executed_fee
+    )
+
+    fill = dict(
+        _id=str(uuid4()),
+        order=order['_id'],
+        user=order['_user'],
+        market=order['market'],
+        direction=order['direction'],
+        quantity=quantity,
+        price=price,
+        total=total,
+        fee=fee,
+        ts=now
+    )
+    fills.record(fill)
+    return fill
@@ -0,0 +1,127 @@
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+from threading import Lock
+
+from core.database import mongo
+from core.profiler import phase
+
+PARTITION_PREFIX = 'fills_'
+
+
+def get_partition_name(dt):
+    return '{}{:%Y%m%d}'.format(PARTITION_PREFIX, dt)
+
+
+class FillBuffer:
+    """Time-ordered ring of the most recent fills with O(log n) range lookups."""
+
+    def __init__(self, capacity, covered_from):
+        self.capacity = capacity
+        self.covered_from = covered_from
+        self.times = []
+        self.fills = []
+
+    def append(self, fill):
+        if not self.times or fill['ts'] >= self.times[-1]:
+            self.times.append(fill['ts'])
+            self.fills.append(fill)
+        else:
+            index = bisect_right(self.times, fill['ts'])
+            self.times.insert(index, fill['ts'])
+            self.fills.insert(index, fill)
+
+        # Trim in batches so appends stay amortized O(1)
+        if len(self.times) > 2 * self.capacity:
+            del self.times[:-self.capacity]
+            del self.fills[:-self.capacity]
+            self.covered_from = self.times[0]
+
+    def range(self, start=None, end=None):
+        low = bisect_left(self.times, start) if start else 0
+        high = bisect_left(self.times, end) if end else len(self.times)
+        return self.fills[low:high]
+
+
+class FillStore:
+    """Fills per account and per market in daily Mongo partitions, recent ones also in memory.
+
+    A buffer only holds the fills recorded by this process. With `single_process` set, it is
+    complete from `covered_from` on (process start, or the oldest fill kept after trimming) and
+    only the part of a range before that is read from the partitions; otherwise other workers'
+    fills would be missing, so every range is read from the partitions and no buffers are kept.
+    """
+
+    def __init__(self, capacity=10000, single_process=False):
+        self.capacity = capacity
+        self.single_process = single_process
+        self.started_at = datetime.utcnow()
+        self.buffers = {}
+        self.partitions = set()
+        self.lock = Lock()
+
+    def init_app(self, app):
+        self.capacity = app.config.get('FILL_BUFFER_SIZE', self.capacity)
+        self.single_process = app.config.get('FILLS_SINGLE_PROCESS', self.single_process)
+        self.started_at = datetime.utcnow()
+
+    def get_buffer(self, key):
+        if key not in self.buffers:
+            self.buffers[key] = FillBuffer(self.capacity, self.started_at)
+        return self.buffers[key]
+
+    def get_partition(self, dt):
+        name = get_partition_name(dt)
+        collection = mongo.db[name]
+        if name not in self.partitions:
+            collection.create_index([('user', 1), ('ts', 1)])
+            collection.create_index([('market', 1), ('ts', 1)])
+            self.partitions.add(name)
+        return collection
+
+    def record(self, fill):
+        with phase('mongo'):
+            self.get_partition(fill['ts']).insert_one(dict(fill))
+        if not self.single_process:
+            return
+        with self.lock:
+            self.get_buffer(('user', fill['user'])).append(fill)
+            self.get_buffer(('market', fill['market'])).append(fill)
+
+    def find_persisted(self, query, start, end):
+        day = start.replace(hour=0, minute=0, second=0, microsecond=0)
+        names = []
+        while day < end:
+            names.append(get_partition_name(day))
+            day += timedelta(days=1)
+
+        result = []
+        with phase('mongo'):
+            for name in names:
+                result.extend(mongo.db[name].find(dict(query, ts={'$gte': start, '$lt': end})).sort('ts', 1))
+        return result
+
+    def find(self, start, end=None, user=None, market=None):
+        """Fills for an account (optionally within a market) or for a market, oldest first, in [start, end).
+
+        Only the days of the range are read from Mongo, so the cost depends on the range asked
+        for, never on the total history.
+        """
+        result = []
+        persisted_end = end or datetime.utcnow()
+        if self.single_process:
+            key = ('user', user) if user else ('market', market)
+            with self.lock:
+                buffer = self.get_buffer(key)
+                result = buffer.range(max(start, buffer.covered_from), end)
+                persisted_end = min(persisted_end, buffer.covered_from)
+
+        if start < persisted_end:
+            query = dict(user=user) if user else dict(market=market)
+            result = self.find_persisted(query, start, persisted_end) + result
+
+        if user and market:
+            result = [fill for fill in result if fill['market'] == market]
+        return result
+
+
+fills = FillStore()
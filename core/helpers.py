@@ -4,6 +4,8 @@ from flask import current_app, request, jsonify, Response
 from functools import wraps
 from enum import Enum
 
+from core.profiler import phase
+
 
 class OrderDirection(Enum):
     BUY = 'buy'
@@ -28,19 +30,22 @@ def proxy_request(preprocess_params=None):
         for key, preprocessor in preprocess_params.items():
             params[key] = preprocessor(params[key])
 
-    res = requests.get('https:/{}'.format(request.path), params=params)
+    with phase('upstream'):
+        res = requests.get('https:/{}'.format(request.path), params=params)
     return Response(res.content, content_type=res.headers['content-type'])
 
 
 def process_request(postprocess_fields: dict):
-    res = requests.get('https:/{}'.format(request.path))
+    with phase('upstream'):
+        res = requests.get('https:/{}'.format(request.path))
     if current_app.config['TESTNET_SYMBOLS']:
-        data = json.loads(res.text, use_decimal=True)
-        if data['success']:
-            for item in data['result']:
-                for field, processor in postprocess_fields.items():
-                    item[field] = processor(item[field])
-        return jsonify(data)
+        with phase('json'):
+            data = json.loads(res.text, use_decimal=True)
+            if data['success']:
+                for item in data['result']:
+                    for field, processor in postprocess_fields.items():
+                        item[field] = processor(item[field])
+            return jsonify(data)
     return Response(res.content, content_type=res.headers['content-type'])
 
 
@@ -0,0 +1,59 @@
+import re
+from decimal import Decimal, ROUND_DOWN
+from bson.decimal128 import Decimal128
+
+# Prices and quantities are integers counting 10 ** -PRECISION units (satoshi for every Bittrex market)
+PRECISION = 8
+SCALE = 10 ** PRECISION
+MAX_VALUE = 2 ** 63 - 1  # fits a Mongo Int64
+# Unsigned, ASCII digits only: str.isdigit and int() would also take e.g. Arabic-Indic or fullwidth digits
+AMOUNT_PATTERN = re.compile(r'([0-9]*)(?:\.([0-9]*))?')
+
+
+class WireDecimal(Decimal):
+    """Decimal that always prints in plain notation (0.00000015, never 1.5E-7), as Bittrex does."""
+
+    def __str__(self):
+        return format(self, 'f')
+
+
+def parse(string: str) -> int:
+    """Parse a plain non-negative decimal string exactly, raise ValueError if it is malformed or too precise."""
+    match = AMOUNT_PATTERN.fullmatch(string)
+    if not match or not (match.group(1) or match.group(2)):
+        raise ValueError('invalid amount: {!r}'.format(string))
+    whole, fraction = match.group(1), match.group(2) or ''
+    if fraction[PRECISION:].strip('0'):
+        raise ValueError('more than {} decimal places: {!r}'.format(PRECISION, string))
+
+    value = int(whole or '0') * SCALE + int(fraction[:PRECISION].ljust(PRECISION, '0'))
+    if value > MAX_VALUE:
+        raise ValueError('amount out of range: {!r}'.format(string))
+    return value
+
+
+def from_decimal(value: Decimal) -> int:
+    return int((value * SCALE).to_integral_value(rounding=ROUND_DOWN))
+
+
+def to_decimal(value: int) -> Decimal:
+    whole, fraction = divmod(abs(value), SCALE)
+    return WireDecimal('{}{}.{:0{}d}'.format('-' if value < 0 else '', whole, fraction, PRECISION))
+
+
+def mul(a: int, b: int) -> int:
+    return a * b // SCALE
+
+
+def div(a: int, b: int) -> int:
+    return a * SCALE // b
+
+
+def get_field(document, key, default=0) -> int:
+    """Read an amount from a stored document, including ones written as Decimal128 before fixed point."""
+    value = document.get(key)
+    if not value:
+        return default
+    if isinstance(value, Decimal128):
+        return from_decimal(value.to_decimal())
+    return value
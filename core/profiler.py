@@ -0,0 +1,151 @@
+import heapq
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from itertools import count
+from flask import g, has_request_context, request
+
+
+@contextmanager
+def phase(name):
+    """Add the time spent in the block to the current request's `name` phase."""
+    if not has_request_context() or 'phases' not in g:
+        yield
+        return
+
+    started_at = time.perf_counter()
+    try:
+        yield
+    finally:
+        g.phases[name] = g.phases.get(name, 0) + time.perf_counter() - started_at
+
+
+def format_frame(frame):
+    code = frame.f_code
+    return '{} ({}:{})'.format(code.co_name, os.path.basename(code.co_filename), code.co_firstlineno)
+
+
+class SamplingProfiler:
+    """Samples the stacks of threads serving requests for a limited window.
+
+    All of a request's work, Mongo and upstream calls included, runs on its own thread, so this
+    covers everything done for it; pymongo's background monitor threads are left out on purpose.
+
+    Stacks are aggregated in the folded format understood by flamegraph.pl and speedscope.
+    """
+
+    def __init__(self, interval=0.005, max_duration=300):
+        self.interval = interval
+        self.max_duration = max_duration
+        self.request_threads = set()
+        self.stacks = Counter()
+        self.samples = 0
+        self.stop_at = 0
+        self.lock = threading.Lock()
+
+    @property
+    def running(self):
+        return time.monotonic() < self.stop_at
+
+    def start(self, duration, interval=None):
+        with self.lock:
+            if self.running:
+                return False
+            self.stacks = Counter()
+            self.samples = 0
+            self.stop_at = time.monotonic() + min(duration, self.max_duration)
+        thread = threading.Thread(target=self.run, args=(interval or self.interval,), name='profiler', daemon=True)
+        thread.start()
+        return True
+
+    def stop(self):
+        self.stop_at = 0
+
+    def run(self, interval):
+        while self.running:
+            self.sample()
+            time.sleep(interval)
+
+    def sample(self):
+        frames = sys._current_frames()
+        for thread_id in list(self.request_threads):
+            frame = frames.get(thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(format_frame(frame))
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+        self.samples += 1
+
+    def folded(self):
+        return ''.join('{} {}\n'.format(stack, samples) for stack, samples in self.stacks.most_common())
+
+
+class SlowRequestLog:
+    """Keeps the slowest requests seen, with the time each spent per phase."""
+
+    def __init__(self, size=100):
+        self.size = size
+        self.heap = []
+        self.counter = count()
+        self.lock = threading.Lock()
+
+    def record(self, duration, entry):
+        item = (duration, next(self.counter), entry)
+        with self.lock:
+            if len(self.heap) < self.size:
+                heapq.heappush(self.heap, item)
+            elif duration > self.heap[0][0]:
+                heapq.heapreplace(self.heap, item)
+
+    def get_entries(self):
+        with self.lock:
+            return [entry for _, _, entry in sorted(self.heap, reverse=True)]
+
+    def clear(self):
+        with self.lock:
+            self.heap = []
+
+
+class RequestProfiler:
+
+    def __init__(self):
+        self.sampler = SamplingProfiler()
+        self.slow_requests = SlowRequestLog()
+
+    def init_app(self, app):
+        self.sampler.interval = app.config.get('PROFILER_INTERVAL', self.sampler.interval)
+        self.sampler.max_duration = app.config.get('PROFILER_MAX_DURATION', self.sampler.max_duration)
+        self.slow_requests.size = app.config.get('SLOW_REQUESTS_SIZE', self.slow_requests.size)
+        app.before_request(self.before_request)
+        app.after_request(self.after_request)
+        app.teardown_request(self.teardown_request)
+
+    def before_request(self):
+        g.started_at = time.perf_counter()
+        g.started_at_utc = datetime.utcnow()
+        g.phases = {}
+        self.sampler.request_threads.add(threading.get_ident())
+
+    def after_request(self, response):
+        duration = time.perf_counter() - g.started_at
+        self.slow_requests.record(duration, dict(
+            started_at=g.started_at_utc.isoformat(),
+            method=request.method,
+            path=request.path,  # query strings carry api keys
+            status=response.status_code,
+            duration_ms=round(duration * 1000, 3),
+            phases_ms={name: round(value * 1000, 3) for name, value in g.phases.items()}
+        ))
+        return response
+
+    def teardown_request(self, exc):
+        self.sampler.request_threads.discard(threading.get_ident())
+
+
+profiler = RequestProfiler()
@@ -0,0 +1,77 @@
+import logging
+import time
+from importlib.util import find_spec
+from flask import Blueprint
+from werkzeug.utils import import_string
+
+
+class LazyView:
+    """View that imports its target on the first request instead of at startup."""
+
+    def __init__(self, import_name):
+        self.import_name = import_name
+        self.__name__ = import_name.rsplit('.', 1)[-1]
+        self._view = None
+
+    @property
+    def view(self):
+        if self._view is None:
+            started_at = time.perf_counter()
+            self._view = import_string(self.import_name)
+            logging.debug('loaded {} in {:.1f}ms'.format(
+                self.import_name, (time.perf_counter() - started_at) * 1000))
+        return self._view
+
+    def __call__(self, *args, **kwargs):
+        return self.view(*args, **kwargs)
+
+
+class ExchangeAdapter:
+
+    def __init__(self, name):
+        self.name = name
+        self.routes = []
+        self.startup_time = None
+
+    def add_routes(self, url_prefix, module_name, views, methods=('GET',)):
+        for rule, view_name in views:
+            self.routes.append((url_prefix + rule, module_name, view_name, list(methods)))
+
+    def make_blueprint(self):
+        blueprint = Blueprint(self.name, __name__)
+        for rule, module_name, view_name, methods in self.routes:
+            # Fail at startup on a typo in the module path, but leave the import itself for the first request
+            if find_spec(module_name) is None:
+                raise ImportError('{} adapter: module {} not found'.format(self.name, module_name))
+            endpoint = '_'.join(module_name.split('.')[-2:] + [view_name])
+            blueprint.add_url_rule(
+                rule,
+                endpoint=endpoint,
+                view_func=LazyView('{}.{}'.format(module_name, view_name)),
+                methods=methods
+            )
+        return blueprint
+
+    def check_views(self):
+        """Import every view now, so a bad view name or a broken import fails here and not on a request."""
+        for _, module_name, view_name, _ in self.routes:
+            import_string('{}.{}'.format(module_name, view_name))
+
+    def init_app(self, app):
+        started_at = time.perf_counter()
+        if app.config.get('EAGER_VIEWS'):
+            self.check_views()
+        app.register_blueprint(self.make_blueprint())
+        self.startup_time = time.perf_counter() - started_at
+        logging.info('registered {} adapter ({} routes) in {:.1f}ms'.format(
+            self.name, len(self.routes), self.startup_time * 1000))
+
+
+def init_adapters(app):
+    adapters = []
+    for import_name in app.config['EXCHANGE_ADAPTERS']:
+        adapter = import_string(import_name)
+        adapter.init_app(app)
+        adapters.append(adapter)
+    app.extensions['exchange_adapters'] = {adapter.name: adapter for adapter in adapters}
+    return adapters
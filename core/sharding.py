@@ -0,0 +1,146 @@
+from itertools import chain
+from threading import Lock
+from uuid import UUID, uuid4
+from zlib import crc32
+from pymongo import ReturnDocument
+
+from core.database import mongo
+from core.profiler import phase
+
+MAX_SHARDS = 256
+SHARD_SHIFT = 120  # the first byte of an order uuid names its shard
+
+
+class OrderShards:
+    """Routes every market to its own orders collection.
+
+    A market's shard is chosen once, stored in the `order_shards` collection and never moves,
+    so every process agrees on it and changing ORDER_SHARDS only affects new markets. Shard 0
+    is the original `orders` collection, and markets that already have orders there stay on it.
+
+    Order uuids carry their shard (see make_id), so lookups by uuid query a single collection,
+    falling back to shard 0 for orders created before sharding. Only queries with neither a
+    market nor a uuid fan out to every shard in use.
+    """
+
+    def __init__(self, count=1):
+        self.count = count
+        self.placements = {}
+        self.stored_indexes = None
+        self.indexes = []
+        self.indexed = set()
+        self.lock = Lock()
+
+    def init_app(self, app):
+        self.count = app.config.get('ORDER_SHARDS', self.count)
+        if not 0 < self.count <= MAX_SHARDS:
+            raise ValueError('ORDER_SHARDS must be between 1 and {}'.format(MAX_SHARDS))
+
+    def add_index(self, keys, **kwargs):
+        """Index created on every shard collection the first time this process uses it."""
+        self.indexes.append((keys, kwargs))
+
+    def get_index(self, market):
+        index = self.placements.get(market)
+        if index is not None:
+            return index
+
+        placement = mongo.db.order_shards.find_one(dict(_id=market))
+        if placement is None:
+            if mongo.db.orders.find_one(dict(market=market), projection=['_id']):
+                index = 0
+            else:
+                index = crc32(market.encode('utf-8')) % self.count
+            # First writer wins, concurrent processes all read back the same placement
+            placement = mongo.db.order_shards.find_one_and_update(
+                dict(_id=market),
+                {'$setOnInsert': dict(shard=index)},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+        self.placements[market] = placement['shard']
+        return placement['shard']
+
+    def get_indexes(self):
+        """Shards in use; placements stored by other processes are read once, so every process
+        must run with the same ORDER_SHARDS."""
+        if self.stored_indexes is None:
+            with phase('mongo'):
+                self.stored_indexes = set(mongo.db.order_shards.distinct('shard'))
+        return sorted(self.stored_indexes | set(self.placements.values()) | set(range(self.count)))
+
+    def make_id(self, market):
+        """Random uuid4 for a new order of the market, with the market's shard in its first byte."""
+        index = self.get_index(market)
+        return str(UUID(int=uuid4().int & ~(0xff << SHARD_SHIFT) | index << SHARD_SHIFT))
+
+    def get_id_index(self, uuid):
+        index = UUID(uuid).int >> SHARD_SHIFT
+        # A legacy uuid's first byte is random, those orders are all in shard 0
+        return index if index in self.get_indexes() else 0
+
+    def get_collection(self, index):
+        collection = mongo.db.orders if index == 0 else mongo.db['orders_{}'.format(index)]
+        if index not in self.indexed:
+            with self.lock:
+                for keys, kwargs in self.indexes:
+                    collection.create_index(keys, **kwargs)
+                self.indexed.add(index)
+        return collection
+
+    def run(self, market, func, *args, **kwargs):
+        with phase('mongo'):
+            return func(self.get_collection(self.get_index(market)), *args, **kwargs)
+
+    def fan_out(self, func, *args, **kwargs):
+        with phase('mongo'):
+            return [func(self.get_collection(index), *args, **kwargs) for index in self.get_indexes()]
+
+    def run_by_market(self, func, items, *args, **kwargs):
+        """Call func(collection, group) once per shard with the items of the markets it holds."""
+        groups = {}
+        for item in items:
+            groups.setdefault(self.get_index(item['market']), []).append(item)
+        with phase('mongo'):
+            return [
+                func(self.get_collection(index), group, *args, **kwargs)
+                for index, group in groups.items()
+            ]
+
+    def find_by_ids(self, query, ids):
+        groups = {}
+        for uuid in ids:
+            groups.setdefault(self.get_id_index(uuid), []).append(uuid)
+
+        result = []
+        with phase('mongo'):
+            for index, group in groups.items():
+                result.extend(self.get_collection(index).find(dict(query, _id={'$in': group})))
+            found = {order['_id'] for order in result}
+            legacy = [uuid for uuid in ids if uuid not in found and self.get_id_index(uuid) != 0]
+            if legacy:
+                result.extend(self.get_collection(0).find(dict(query, _id={'$in': legacy})))
+        return result
+
+    def find(self, query):
+        if query.get('market'):
+            return self.run(query['market'], lambda orders: list(orders.find(query)))
+        if isinstance(query.get('_id'), dict):
+            results = [self.find_by_ids(query, query['_id']['$in'])]
+        else:
+            results = self.fan_out(lambda orders: list(orders.find(query)))
+        return sorted(chain.from_iterable(results), key=lambda order: order['opened_at'])
+
+    def find_one(self, query):
+        if query.get('market'):
+            return self.run(query['market'], lambda orders: orders.find_one(query))
+        if query.get('_id'):
+            return next(iter(self.find_by_ids(query, [query['_id']])), None)
+        with phase('mongo'):
+            for index in self.get_indexes():
+                order = self.get_collection(index).find_one(query)
+                if order:
+                    return order
+
+
+shards = OrderShards()
@@ -0,0 +1,43 @@
+import pytest
+
+from core import admission as admission_module
+from core.admission import AdmissionControl, TokenBucket
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(admission_module.time, 'monotonic', lambda: now[0])
+    return now
+
+
+def test_bucket_refills_up_to_burst(clock):
+    bucket = TokenBucket(rate=2, burst=4)
+    assert bucket.take(4)
+    assert not bucket.take(1)
+
+    clock[0] += 0.5
+    assert bucket.take(1)
+    assert not bucket.take(1)
+
+    clock[0] += 60
+    assert bucket.take(4)
+    assert not bucket.take(1)
+
+
+def test_weights_and_keys(clock):
+    control = AdmissionControl(rate=1, burst=10, weights=dict(bulk=10))
+    assert control.acquire('a', 'bulk')
+    assert not control.acquire('a', 'bulk')
+    assert control.acquire('a', 'order')  # every route class has its own bucket
+    assert control.acquire('b', 'bulk')
+
+
+def test_sheds_over_max_in_flight(clock):
+    control = AdmissionControl(rate=100, burst=100, max_in_flight=2)
+    assert control.acquire('a', 'order')
+    assert control.acquire('b', 'order')
+    assert not control.acquire('c', 'order')
+
+    control.release()
+    assert control.acquire('c', 'order')
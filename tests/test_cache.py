@@ -0,0 +1,106 @@
+import pickle
+
+import pytest
+from flask import Flask, request
+
+from core import cache as cache_module
+from core.cache import CacheSnapshot, SnapshotTTLCache, cache, cached_response
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, 'time', lambda: now[0])
+    return now
+
+
+def test_restore_keeps_remaining_ttl(clock):
+    source = SnapshotTTLCache(maxsize=10, ttl=60)
+    source['fresh'] = 1
+    clock[0] += 50
+    source['young'] = 2
+    items = source.dump()
+
+    clock[0] += 5  # restart
+    target = SnapshotTTLCache(maxsize=10, ttl=60)
+    target.restore(items)
+    assert target['fresh'] == 1 and target['young'] == 2
+    assert target.offset == 0
+
+    clock[0] += 6  # 61s after 'fresh' was stored
+    assert 'fresh' not in target
+    assert target['young'] == 2
+
+    clock[0] += 50
+    assert 'young' not in target
+
+
+def test_restore_skips_expired(clock):
+    source = SnapshotTTLCache(maxsize=10, ttl=60)
+    source['old'] = 1
+    items = source.dump()
+
+    clock[0] += 60
+    target = SnapshotTTLCache(maxsize=10, ttl=60)
+    target.restore(items)
+    assert len(target) == 0
+
+
+def test_save_keeps_unregistered_caches(tmpdir):
+    snapshot = CacheSnapshot()
+    snapshot.path = str(tmpdir.join('cache.snapshot'))
+    snapshot.loaded = dict(lazy=[('key', 'value', 0)])
+    snapshot.register('registered', SnapshotTTLCache(maxsize=10, ttl=60))['key'] = 'value'
+    snapshot.save()
+
+    with open(snapshot.path, 'rb') as f:
+        data = pickle.load(f)
+    assert data['lazy'] == [('key', 'value', 0)]
+    assert [key for key, _, _ in data['registered']] == ['key']
+    assert tmpdir.listdir() == [tmpdir.join('cache.snapshot')]
+
+
+def test_load_ignores_corrupt_snapshot(tmpdir):
+    snapshot = CacheSnapshot()
+    snapshot.path = str(tmpdir.join('cache.snapshot'))
+    with open(snapshot.path, 'wb') as f:
+        f.write(b'\x80\x04not a pickle')
+    snapshot.load()
+    assert snapshot.loaded == {}
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+    app.config['CACHE_TYPE'] = 'simple'
+    cache.init_app(app)
+    calls = []
+
+    @app.route('/ticker')
+    @cached_response(timeout=60)
+    def ticker():
+        calls.append(request.args.get('market'))
+        return 'ticker {}'.format(request.args.get('market'))
+
+    with app.app_context():
+        cache.clear()
+    client = app.test_client()
+    client.calls = calls
+    return client
+
+
+def test_cached_response_not_modified(client):
+    response = client.get('/ticker?market=BTC-LTC')
+    etag = response.headers['ETag']
+    assert response.status_code == 200
+    assert response.headers['Last-Modified']
+
+    response = client.get('/ticker?market=BTC-LTC', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.data == b''
+    assert client.calls == ['BTC-LTC']
+
+    response = client.get('/ticker?market=BTC-ETH', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.data == b'ticker BTC-ETH'
+    assert client.calls == ['BTC-LTC', 'BTC-ETH']
@@ -0,0 +1,40 @@
+import os
+
+from core.events import OrderEventLog, OrderEventType
+
+
+def test_rotates_segments(tmpdir):
+    log = OrderEventLog(str(tmpdir), segment_size=1)
+    for number in range(3):
+        log.append(OrderEventType.OPENED, str(number))
+
+    segments = log.get_segments()
+    assert len(segments) == 3
+    assert all(name.startswith(log.writer_id) for name in segments)
+    assert '-{}-'.format(os.getpid()) in log.writer_id
+    assert [event['order'] for event in log.replay()] == ['0', '1', '2']
+
+
+def test_skips_torn_last_line(tmpdir):
+    log = OrderEventLog(str(tmpdir))
+    log.append(OrderEventType.OPENED, 'a')
+    log.append(OrderEventType.CANCELED, 'a')
+    log.segment.write('{"ts":')
+    log.segment.flush()
+
+    assert [event['type'] for event in log.replay()] == ['opened', 'canceled']
+
+
+def test_replay_merges_writers_by_time(tmpdir):
+    first, second = OrderEventLog(str(tmpdir)), OrderEventLog(str(tmpdir))
+    first.append(OrderEventType.OPENED, 'a')
+    second.append(OrderEventType.OPENED, 'b')
+    first.append(OrderEventType.FILLED, 'a')
+    second.append(OrderEventType.CANCELED, 'b')
+
+    # Both writers live in this process, so they differ only by their random part
+    assert first.writer_id != second.writer_id
+    assert len(first.get_segments()) == 2
+    assert [(event['order'], event['type']) for event in first.replay()] == [
+        ('a', 'opened'), ('b', 'opened'), ('a', 'filled'), ('b', 'canceled')
+    ]
@@ -0,0 +1,51 @@
+from decimal import Decimal
+
+import pytest
+
+from core import money
+
+
+def test_parse():
+    assert money.parse('1') == 100000000
+    assert money.parse('0.00000001') == 1
+    assert money.parse('.5') == 50000000
+    assert money.parse('2.') == 200000000
+    assert money.parse('0.100000000000') == 10000000
+
+
+@pytest.mark.parametrize('string', [
+    '', '-', '.', '-1.25', '-0', '1.2.3', '1e-7', ' 1', '1,5', '+1', '--1',
+    '١',  # ARABIC-INDIC DIGIT ONE
+    '１.5',  # FULLWIDTH DIGIT ONE
+    '0.²',  # SUPERSCRIPT TWO
+])
+def test_parse_rejects_malformed(string):
+    with pytest.raises(ValueError, match='invalid amount'):
+        money.parse(string)
+
+
+def test_parse_rejects_too_precise():
+    with pytest.raises(ValueError, match='decimal places'):
+        money.parse('0.000000001')
+
+
+def test_parse_rejects_out_of_range():
+    assert money.parse('92233720368.54775807') == money.MAX_VALUE
+    with pytest.raises(ValueError, match='out of range'):
+        money.parse('92233720368.54775808')
+
+
+def test_to_decimal():
+    assert str(money.to_decimal(15)) == '0.00000015'
+    assert str(money.to_decimal(-125000000)) == '-1.25000000'
+    assert money.to_decimal(money.parse('123.45678901')) == Decimal('123.45678901')
+
+
+def test_from_decimal_rounds_down():
+    assert money.from_decimal(Decimal('0.123456789')) == 12345678
+
+
+def test_mul_and_div():
+    assert money.mul(money.parse('0.5'), money.parse('0.0025')) == money.parse('0.00125')
+    assert money.mul(1, 1) == 0
+    assert money.div(money.parse('1'), money.parse('3')) == 33333333
@@ -0,0 +1,8 @@
+from werkzeug.utils import import_string
+
+from config import dev
+
+
+def test_adapter_views_resolve():
+    for import_name in dev.EXCHANGE_ADAPTERS:
+        import_string(import_name).check_views()